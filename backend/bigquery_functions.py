@@ -1,5 +1,11 @@
 import os
 from google.cloud import bigquery
+try:
+    # Optional: Arrow columnar transport for large result sets.
+    from google.cloud import bigquery_storage
+except ImportError:
+    bigquery_storage = None
+import collections
 import datetime
 import uuid
 import logging
@@ -26,8 +32,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__) # Use a specific logger for this module
 
-# Global store for logs
-GLOBAL_LOG_STORE = []
+class LogStore:
+    """Bounded in-memory log ring with an O(1) clear.
+
+    Wraps a deque(maxlen=...) so appends are O(1) and old entries fall
+    off the front once the cap is hit. clear() rebinds a fresh deque
+    instead of decref'ing every entry under the GIL; the old one is
+    freed by GC off the hot path. snapshot() hands callers a stable
+    tuple to iterate while appends continue.
+    """
+    __slots__ = ("_dq", "_max")
+
+    def __init__(self, maxlen=10000):
+        self._max = maxlen
+        self._dq = collections.deque(maxlen=maxlen)
+
+    def append(self, entry):
+        self._dq.append(entry)
+
+    def __iter__(self):
+        return iter(self._dq)
+
+    def __len__(self):
+        return len(self._dq)
+
+    def snapshot(self):
+        return tuple(self._dq)
+
+    def clear(self):
+        self._dq = collections.deque(maxlen=self._max)
+
+
+# Global store for logs. Bounded so a long-running session cannot grow
+# it without limit.
+GLOBAL_LOG_STORE = LogStore(maxlen=10000)
  
 CREDENTIALS_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 GOOGLE_CLOUD_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -37,9 +75,30 @@ GOOGLE_CLOUD_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT")
 # For local development, you might set it like this:
 # os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "path/to/your/service-account-file.json"
 # In a deployed environment (e.g., Google Cloud Run/Functions), this is often handled automatically.
+# The tool layer fans out up to 32 concurrent BQ calls (see _BQ_SEM in
+# gemini_tools); the default requests pool of 10 connections would serialize
+# them. Size the HTTP connection pool to match, overridable via env var.
+BQ_HTTP_POOL_SIZE = int(os.getenv("BQ_HTTP_POOL_SIZE", "32"))
+
+def _build_bq_client() -> bigquery.Client:
+    """Build the shared BigQuery client with a connection pool sized for concurrent tool calls."""
+    try:
+        import google.auth
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+
+        credentials, _ = google.auth.default()
+        session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=BQ_HTTP_POOL_SIZE, pool_maxsize=BQ_HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        return bigquery.Client(project="account-pocs", _http=session)
+    except Exception as pool_exc:
+        logger.warning("Could not size BigQuery HTTP pool (%s); using default client.", pool_exc)
+        return bigquery.Client(project="account-pocs")
+
 try:
     # client = bigquery.Client(project=GOOGLE_CLOUD_PROJECT, credentials=service_account.Credentials.from_service_account_file(CREDENTIALS_PATH))
-    client = bigquery.Client(project="account-pocs")
+    client = _build_bq_client()
     # Attempt a simple query to verify connection and credentials
     # This also helps in resolving the project ID if not explicitly set
     if client.project:
@@ -67,6 +126,21 @@ if not PROJECT_ID:
 DATASET_ID = "bank_voice_assistant_dataset" # Assuming the dataset name from bigquery_setup.sql
 
 # --- Structured Logging Helper ---
+class _LazyJson:
+    """Defers json.dumps of a log entry until the record is actually emitted.
+
+    Passed as a %s argument so stdlib logging only serializes when the
+    level is enabled; filtered records cost nothing.
+    """
+    __slots__ = ("entry",)
+
+    def __init__(self, entry):
+        self.entry = entry
+
+    def __str__(self):
+        return json.dumps(self.entry, default=str)
+
+
 def log_bq_interaction(func_name: str, params: dict, query: str = None, status: str = "N/A", result_summary: str = None, error_message: str = None):
     """Helper function for structured logging of BigQuery interactions."""
     log_entry = {
@@ -88,9 +162,9 @@ def log_bq_interaction(func_name: str, params: dict, query: str = None, status:
     GLOBAL_LOG_STORE.append(log_entry)
 
     if "ERROR" in status.upper() or "FAIL" in status.upper():
-        logger.error(json.dumps(log_entry)) # Error logs remain default color
+        logger.error("%s", _LazyJson(log_entry)) # Error logs remain default color
     else:
-        logger.info("\033[92m%s\033[0m", json.dumps(log_entry)) # Successful BQ interactions in green
+        logger.info("\033[92m%s\033[0m", _LazyJson(log_entry)) # Successful BQ interactions in green
 
 # Helper to construct full table IDs
 def _table_ref(table_name: str) -> str:
@@ -272,6 +346,88 @@ def get_transaction_history(account_type: str, limit: int = 5) -> list:
         return [{"status": "ERROR_QUERY_FAILED", "message": str(e)}]
 
 
+# Below this row count the REST iterator wins; above it the Storage Read API's
+# setup cost is paid back by the faster Arrow transport.
+_BQSTORAGE_MIN_LIMIT = 50
+_bqstorage_client = None
+
+def _get_bqstorage_client():
+    """Lazily build the shared BigQueryReadClient; None when unavailable."""
+    global _bqstorage_client
+    if bigquery_storage is None:
+        return None
+    if _bqstorage_client is None:
+        try:
+            _bqstorage_client = bigquery_storage.BigQueryReadClient()
+        except Exception as e:
+            logger.warning("Could not initialize BigQuery Storage client (%s); using row iterator.", e)
+            return None
+    return _bqstorage_client
+
+
+def get_transactions_for_account(user_id: str, account_id: str, limit: int = 10) -> list:
+    """
+    Fetches the last N transactions for a specific account_id belonging to user_id.
+    Unlike get_transaction_history, this skips the natural-language account
+    resolution step and queries by account_id directly. Large limits are read
+    through the Storage Read API when the client library is available.
+    """
+    func_name = "get_transactions_for_account"
+    params = {"user_id": user_id, "account_id": account_id, "limit": limit}
+    query_str = None
+
+    if not client:
+        log_bq_interaction(func_name, params, status="ERROR_CLIENT_NOT_INITIALIZED", error_message="BigQuery client not available.")
+        return []
+
+    transactions_table = _table_ref("Transactions")
+    query_str = f"""
+        SELECT transaction_id, date, description, amount, type, memo
+        FROM {transactions_table}
+        WHERE user_id = @user_id AND account_id = @account_id
+        ORDER BY date DESC
+        LIMIT @limit
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
+            bigquery.ScalarQueryParameter("account_id", "STRING", account_id),
+            bigquery.ScalarQueryParameter("limit", "INT64", limit),
+        ]
+    )
+    try:
+        query_job = client.query(query_str, job_config=job_config)
+
+        rows = None
+        bqstorage = _get_bqstorage_client() if limit >= _BQSTORAGE_MIN_LIMIT else None
+        if bqstorage is not None:
+            try:
+                rows = query_job.to_arrow(bqstorage_client=bqstorage).to_pylist()
+            except Exception as arrow_err:
+                logger.warning("[%s] Storage Read API path failed (%s); falling back to row iterator.", func_name, arrow_err)
+        if rows is None:
+            rows = [dict(row) for row in query_job.result()]
+
+        transactions_data = []
+        for row in rows:
+            date = row["date"]
+            transactions_data.append({
+                "transaction_id": row["transaction_id"],
+                "date": date.isoformat() if isinstance(date, (datetime.datetime, datetime.date)) else str(date),
+                "description": row["description"],
+                "amount": float(row["amount"]),
+                "type": row["type"],
+                "category": row["memo"]  # No category column in schema; memo is the closest analogue
+            })
+
+        log_bq_interaction(func_name, params, query_str, status="SUCCESS", result_summary=f"Retrieved {len(transactions_data)} transaction(s) for {account_id}.")
+        return transactions_data
+    except Exception as e:
+        logger.error("Exception details in %s: %s", func_name, str(e), exc_info=True)
+        log_bq_interaction(func_name, params, query_str, status="ERROR_QUERY_FAILED", error_message=str(e))
+        return []
+
+
 def initiate_fund_transfer_check(from_account_type: str, to_account_type: str, amount: float) -> dict:
     """
     Checks if a fund transfer is possible between two account types for the USER_ID.
@@ -283,14 +439,17 @@ def initiate_fund_transfer_check(from_account_type: str, to_account_type: str, a
         log_bq_interaction(func_name, params, status="ERROR_INVALID_AMOUNT", error_message="Transfer amount must be a positive number.")
         return {"status": "ERROR_INVALID_AMOUNT", "message": "Transfer amount must be a positive number."}
 
-    # _get_account_details logs its own interactions
-    from_account_details = find_account_by_natural_language(USER_ID, from_account_type)
+    # Both account resolutions match against the same account list, so fetch it
+    # once and resolve the two names from it instead of issuing two identical
+    # BQ round-trips back-to-back.
+    all_accounts = get_accounts_for_user(USER_ID)
+    from_account_details = find_account_by_natural_language(USER_ID, from_account_type, accounts=all_accounts)
     if from_account_details["status"] != "SUCCESS":
         err_msg = f"From account ('{from_account_type}'): {from_account_details.get('message', 'Error fetching details.')}"
         log_bq_interaction(func_name, params, status=from_account_details["status"], error_message=err_msg)
         return {"status": from_account_details["status"], "message": err_msg}
 
-    to_account_details = find_account_by_natural_language(USER_ID, to_account_type)
+    to_account_details = find_account_by_natural_language(USER_ID, to_account_type, accounts=all_accounts)
     if to_account_details["status"] != "SUCCESS":
         err_msg = f"To account ('{to_account_type}'): {to_account_details.get('message', 'Error fetching details.')}"
         log_bq_interaction(func_name, params, status=to_account_details["status"], error_message=err_msg)
@@ -325,10 +484,19 @@ def initiate_fund_transfer_check(from_account_type: str, to_account_type: str, a
     return {"status": status, **result_data}
 
 
-def execute_fund_transfer(from_account_id: str, to_account_id: str, amount: float, currency: str, memo: str) -> dict:
+# Sentinel raised from inside the transfer script when the guarded debit
+# matches zero rows; detected in the exception handler to map the script
+# abort onto ERROR_INSUFFICIENT_FUNDS.
+_XFER_REVALIDATION_FAILED = "TRANSFER_REVALIDATION_FAILED_INSUFFICIENT_FUNDS"
+
+
+def execute_fund_transfer(from_account_id: str, to_account_id: str, amount: float, currency: str, memo: str, precheck: bool = True) -> dict:
     """
     Executes a fund transfer by updating account balances and recording transactions in BigQuery.
     Operations are performed within a multi-statement transaction for atomicity.
+    When precheck is False the per-account balance/currency validation queries are
+    skipped; callers pass this when the transfer was already validated moments ago
+    (e.g. via a held confirmation from initiate_fund_transfer_check).
     """
     func_name = "execute_fund_transfer"
     params = {"from_account_id": from_account_id, "to_account_id": to_account_id, "amount": amount, "currency": currency, "memo": memo, "user_id": USER_ID}
@@ -346,34 +514,35 @@ def execute_fund_transfer(from_account_id: str, to_account_id: str, amount: floa
         log_bq_interaction(func_name, params, status="ERROR_SAME_ACCOUNT", error_message="Cannot execute transfer to the same account ID.")
         return {"status": "ERROR_SAME_ACCOUNT", "message": "Cannot transfer funds to the same account."}
 
-    # Fetch account details for validation
-    from_account_details = get_account_balance_by_id(from_account_id, USER_ID)
-    if from_account_details["status"] != "SUCCESS":
-        err_msg = f"Sender account '{from_account_id}' not found or error: {from_account_details.get('message')}"
-        log_bq_interaction(func_name, params, status="ERROR_FROM_ACCOUNT_INVALID", error_message=err_msg)
-        return {"status": "ERROR_FROM_ACCOUNT_INVALID", "message": err_msg}
-
-    to_account_details = get_account_balance_by_id(to_account_id, USER_ID)
-    if to_account_details["status"] != "SUCCESS":
-        err_msg = f"Recipient account '{to_account_id}' not found or error: {to_account_details.get('message')}"
-        log_bq_interaction(func_name, params, status="ERROR_TO_ACCOUNT_INVALID", error_message=err_msg)
-        return {"status": "ERROR_TO_ACCOUNT_INVALID", "message": err_msg}
-
-    if from_account_details["currency"] != currency or to_account_details["currency"] != currency:
-        err_msg = (f"Currency mismatch. Transfer currency: {currency}, "
-                   f"Sender account ({from_account_id}) currency: {from_account_details['currency']}, "
-                   f"Recipient account ({to_account_id}) currency: {to_account_details['currency']}.")
-        log_bq_interaction(func_name, params, status="ERROR_CURRENCY_MISMATCH", error_message=err_msg)
-        return {"status": "ERROR_CURRENCY_MISMATCH", "message": err_msg}
-
-    if from_account_details["balance"] < amount:
-        err_msg = f"Insufficient funds in sender account '{from_account_id}'. Has: {from_account_details['balance']} {currency}, Needs: {amount} {currency}"
-        log_bq_interaction(func_name, params, status="ERROR_INSUFFICIENT_FUNDS", error_message=err_msg)
-        return {
-            "status": "ERROR_INSUFFICIENT_FUNDS", "current_balance": from_account_details['balance'],
-            "requested_amount": amount, "currency": currency,
-            "from_account_id": from_account_id, "to_account_id": to_account_id, "message": err_msg
-        }
+    # Fetch account details for validation (skipped for pre-validated transfers)
+    if precheck:
+        from_account_details = get_account_balance_by_id(from_account_id, USER_ID)
+        if from_account_details["status"] != "SUCCESS":
+            err_msg = f"Sender account '{from_account_id}' not found or error: {from_account_details.get('message')}"
+            log_bq_interaction(func_name, params, status="ERROR_FROM_ACCOUNT_INVALID", error_message=err_msg)
+            return {"status": "ERROR_FROM_ACCOUNT_INVALID", "message": err_msg}
+
+        to_account_details = get_account_balance_by_id(to_account_id, USER_ID)
+        if to_account_details["status"] != "SUCCESS":
+            err_msg = f"Recipient account '{to_account_id}' not found or error: {to_account_details.get('message')}"
+            log_bq_interaction(func_name, params, status="ERROR_TO_ACCOUNT_INVALID", error_message=err_msg)
+            return {"status": "ERROR_TO_ACCOUNT_INVALID", "message": err_msg}
+
+        if from_account_details["currency"] != currency or to_account_details["currency"] != currency:
+            err_msg = (f"Currency mismatch. Transfer currency: {currency}, "
+                       f"Sender account ({from_account_id}) currency: {from_account_details['currency']}, "
+                       f"Recipient account ({to_account_id}) currency: {to_account_details['currency']}.")
+            log_bq_interaction(func_name, params, status="ERROR_CURRENCY_MISMATCH", error_message=err_msg)
+            return {"status": "ERROR_CURRENCY_MISMATCH", "message": err_msg}
+
+        if from_account_details["balance"] < amount:
+            err_msg = f"Insufficient funds in sender account '{from_account_id}'. Has: {from_account_details['balance']} {currency}, Needs: {amount} {currency}"
+            log_bq_interaction(func_name, params, status="ERROR_INSUFFICIENT_FUNDS", error_message=err_msg)
+            return {
+                "status": "ERROR_INSUFFICIENT_FUNDS", "current_balance": from_account_details['balance'],
+                "requested_amount": amount, "currency": currency,
+                "from_account_id": from_account_id, "to_account_id": to_account_id, "message": err_msg
+            }
 
     transaction_base_id = f"txn_{uuid.uuid4().hex}"
     debit_transaction_id = f"{transaction_base_id}_D"
@@ -392,13 +561,28 @@ def execute_fund_transfer(from_account_id: str, to_account_id: str, amount: floa
     # For direct DML string construction, ensure numeric types are not quoted, strings are.
     # BigQuery's standard SQL client.query() with @params should handle this.
 
+    # When the Python precheck was skipped (held-confirmation path), the
+    # balance may have changed between initiate and execute — e.g. an
+    # interleaved payBill draining the account within the hold window —
+    # so the SQL itself must revalidate: the debit only matches while
+    # sufficient funds remain, and a zero-row debit aborts the
+    # transaction before any money moves.
+    debit_guard = "" if precheck else " AND balance >= @amount"
+    revalidation_check = "" if precheck else f"""
+    IF @@row_count = 0 THEN
+      ROLLBACK TRANSACTION;
+      SELECT ERROR('{_XFER_REVALIDATION_FAILED}');
+    END IF;
+"""
+
     query_str = f"""
     BEGIN TRANSACTION;
 
-    -- Decrement sender's balance
+    -- Decrement sender's balance (guarded when prevalidation was skipped)
     UPDATE {accounts_table}
     SET balance = balance - @amount
-    WHERE account_id = @from_account_id AND user_id = @user_id;
+    WHERE account_id = @from_account_id AND user_id = @user_id{debit_guard};
+{revalidation_check}
 
     -- Increment recipient's balance
     UPDATE {accounts_table}
@@ -452,6 +636,18 @@ def execute_fund_transfer(from_account_id: str, to_account_id: str, amount: floa
             "message": success_msg
         }
     except Exception as e:
+        if _XFER_REVALIDATION_FAILED in str(e):
+            # The in-script guard fired: funds were drained (or the
+            # account vanished) while the confirmation was held. The
+            # script already rolled back before any money moved.
+            err_msg = (f"Insufficient funds in sender account '{from_account_id}' at execution time "
+                       f"for {amount} {currency}. Transfer aborted and rolled back.")
+            log_bq_interaction(func_name, params, query_str, status="ERROR_INSUFFICIENT_FUNDS", error_message=err_msg)
+            return {
+                "status": "ERROR_INSUFFICIENT_FUNDS",
+                "requested_amount": amount, "currency": currency,
+                "from_account_id": from_account_id, "to_account_id": to_account_id, "message": err_msg
+            }
         error_message = f"Exception during fund transfer: {str(e)}"
         logger.error("[%s] %s", func_name, error_message, exc_info=True)
         # Attempt to rollback if possible, though BigQuery auto-rolls back on error in a transaction
@@ -601,9 +797,12 @@ def get_account_balance_by_id(account_id: str, user_id: str) -> dict:
         return {"status": "ERROR_QUERY_FAILED", "message": str(e)}
 
 
-def pay_bill(amount: float, payee_id: str = None, bill_type: str = None, from_account_id: str = None, user_id: str = None) -> dict:
+def pay_bill(amount: float, payee_id: str = None, bill_type: str = None, from_account_id: str = None, user_id: str = None, payee_name: str = None) -> dict:
     """
     Pays a bill, identified by either payee_id or bill_type.
+
+    When the caller already knows the biller's display name (e.g. from a
+    cached catalog), pass it as payee_name to skip the lookup query.
     """
     func_name = "pay_bill"
     user_id = user_id or USER_ID
@@ -662,7 +861,7 @@ def pay_bill(amount: float, payee_id: str = None, bill_type: str = None, from_ac
             "from_account_id": from_account_id, "payee_id": payee_id, "message": err_msg
         }
 
-    payee_name = _get_payee_name(payee_id, user_id)
+    payee_name = payee_name or _get_payee_name(payee_id, user_id)
     if not payee_name:
         err_msg = f"Biller with ID '{payee_id}' not found for user '{user_id}'."
         log_bq_interaction(func_name, params, status="ERROR_BILLER_NOT_FOUND", error_message=err_msg)
@@ -925,6 +1124,47 @@ def remove_biller(user_id: str, payee_id: str) -> dict:
         return {"status": "ERROR_DELETE_FAILED", "message": "Failed to remove biller."}
 
 
+def run_script(statements: list, query_parameters: list = None) -> dict:
+    """Executes several DML statements as one transactional BigQuery script.
+
+    Wraps the statements in BEGIN TRANSACTION ... COMMIT TRANSACTION and
+    submits them as a single query job, so a chained multi-step intent
+    (e.g. register a biller then pay its bill) costs one RPC and one job
+    startup instead of one per statement. Parameter names must be unique
+    across all statements since they share one job config.
+    """
+    func_name = "run_script"
+    params = {"statement_count": len(statements)}
+
+    if not client:
+        log_bq_interaction(func_name, params, status="ERROR_CLIENT_NOT_INITIALIZED", error_message="BigQuery client not available.")
+        return {"status": "ERROR_CLIENT_NOT_INITIALIZED", "message": "BigQuery client not available."}
+
+    if not statements:
+        return {"status": "SUCCESS", "message": "No statements to execute."}
+
+    body = ";\n".join(s.rstrip().rstrip(";") for s in statements)
+    script_sql = f"BEGIN TRANSACTION;\n{body};\nCOMMIT TRANSACTION;"
+    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters or [])
+
+    try:
+        query_job = client.query(script_sql, job_config=job_config)
+        query_job.result()  # Wait for the whole transaction to complete
+
+        if query_job.errors:
+            error_detail = f"BigQuery script execution failed: {query_job.errors}"
+            log_bq_interaction(func_name, params, script_sql, status="ERROR_SCRIPT_FAILED", error_message=error_detail)
+            return {"status": "ERROR_SCRIPT_FAILED", "message": "Chained statement execution failed.", "details": query_job.errors}
+
+        success_msg = f"Executed {len(statements)} statement(s) in one transaction."
+        log_bq_interaction(func_name, params, script_sql, status="SUCCESS", result_summary=success_msg)
+        return {"status": "SUCCESS", "message": success_msg}
+    except Exception as e:
+        logger.error("Exception in run_script: %s", str(e), exc_info=True)
+        log_bq_interaction(func_name, params, script_sql, status="ERROR_SCRIPT_FAILED", error_message=str(e))
+        return {"status": "ERROR_SCRIPT_FAILED", "message": "Chained statement execution failed."}
+
+
 def list_registered_billers(user_id: str) -> dict:
     """
     Lists all registered billers for a given user.
@@ -1019,19 +1259,21 @@ def get_accounts_for_user(user_id: str) -> list:
         return [{"status": "ERROR_QUERY_FAILED", "message": "An error occurred while fetching your accounts."}]
 
 
-def find_account_by_natural_language(user_id: str, natural_language_string: str) -> dict:
+def find_account_by_natural_language(user_id: str, natural_language_string: str, accounts: list = None) -> dict:
     """
     Finds the best matching account for a user based on a natural language string.
     It scores based on account_type, account_id, and synonyms.
+    Pass a pre-fetched account list via `accounts` to share one BQ round-trip
+    across several resolutions (e.g. the from/to pair of a transfer).
     """
     func_name = "find_account_by_natural_language"
     params = {"user_id": user_id, "natural_language_string": natural_language_string}
-    
+
     if not natural_language_string:
         log_bq_interaction(func_name, params, status="ERROR_INVALID_INPUT", error_message="Natural language string cannot be empty.")
         return {"status": "ERROR_INVALID_INPUT", "message": "No account specified."}
 
-    all_accounts = get_accounts_for_user(user_id)
+    all_accounts = accounts if accounts is not None else get_accounts_for_user(user_id)
     if not all_accounts or "status" in all_accounts[0]: # Check if get_accounts_for_user returned an error
         log_bq_interaction(func_name, params, status="ERROR_FETCHING_ACCOUNTS", error_message="Could not fetch user accounts.")
         return {"status": "ERROR_FETCHING_ACCOUNTS", "message": "Could not retrieve your accounts to perform search."}
@@ -1100,4 +1342,19 @@ def find_account_by_natural_language(user_id: str, natural_language_string: str)
     else:
         err_msg = f"Could not find a matching account for '{natural_language_string}'. Please be more specific (e.g., 'checking account', 'savings')."
         log_bq_interaction(func_name, params, status="ERROR_ACCOUNT_NOT_FOUND", error_message=err_msg)
-        return {"status": "ERROR_ACCOUNT_NOT_FOUND", "message": err_msg}
\ No newline at end of file
+        return {"status": "ERROR_ACCOUNT_NOT_FOUND", "message": err_msg}
+
+
+def find_accounts_by_natural_language_bulk(user_id: str, natural_language_strings: list) -> dict:
+    """
+    Resolves several natural-language account names against one accounts fetch.
+    Returns {name: resolution} where each resolution has the same shape as
+    find_account_by_natural_language's result. Lets callers coalesce concurrent
+    resolutions (e.g. parallel tool calls in one LLM turn) into a single BQ
+    round-trip.
+    """
+    all_accounts = get_accounts_for_user(user_id)
+    return {
+        name: find_account_by_natural_language(user_id, name, accounts=all_accounts)
+        for name in natural_language_strings
+    }
\ No newline at end of file
@@ -115,39 +115,78 @@ def file_exists_in_gcs(gcs_file_name):
     print(f"Local file existence check for {gcs_file_name}: {exists}")
     return exists
 
+def get_blob_generation(gcs_file_name):
+    """Get the GCS generation number for a file, or None if unavailable.
+
+    A generation fetch is a single cheap metadata RPC; callers use it to
+    decide whether an in-process cached copy of the blob is still current
+    without re-downloading it. Falls back to the local file's mtime when
+    GCS is unavailable.
+    """
+    if storage_client:
+        try:
+            bucket = storage_client.bucket(BUCKET_NAME)
+            blob = bucket.get_blob(f"{LOGO_FOLDER}{gcs_file_name}")
+            return blob.generation if blob else None
+        except (exceptions.GoogleCloudError, PermissionError) as e:
+            print(f"GCS generation check failed: {e}. Falling back to local file system.")
+        except Exception as e:
+            print(f"Unexpected error during GCS generation check: {e}. Falling back to local file system.")
+            import traceback
+            traceback.print_exc()
+
+    # Fallback to local file system: mtime plays the role of generation
+    local_path = os.path.join(UPLOAD_FOLDER, gcs_file_name)
+    if os.path.exists(local_path):
+        return os.path.getmtime(local_path)
+    return None
+
+def get_file_header(gcs_file_name, n=32):
+    """Get the first n bytes of a file via a ranged GCS download.
+
+    Useful for signature-only checks (e.g. PNG/JPEG magic bytes) where
+    downloading the whole blob would waste bandwidth.
+    """
+    if storage_client:
+        try:
+            bucket = storage_client.bucket(BUCKET_NAME)
+            blob = bucket.blob(f"{LOGO_FOLDER}{gcs_file_name}")
+            # Ranged download: end is inclusive, so bytes 0..n-1.
+            header = blob.download_as_bytes(start=0, end=n - 1, checksum=None)
+            print(f"Downloaded {len(header)} header bytes from GCS: {gcs_file_name}")
+            return header
+        except (exceptions.GoogleCloudError, PermissionError) as e:
+            print(f"GCS header download failed: {e}. Falling back to local file system.")
+        except Exception as e:
+            print(f"Unexpected error during GCS header download: {e}. Falling back to local file system.")
+            import traceback
+            traceback.print_exc()
+
+    # Fallback to local file system
+    local_path = os.path.join(UPLOAD_FOLDER, gcs_file_name)
+    if os.path.exists(local_path):
+        with open(local_path, 'rb') as f:
+            return f.read(n)
+
+    print(f"File {gcs_file_name} not found in local storage")
+    raise FileNotFoundError(f"File {gcs_file_name} not found in GCS or local storage")
+
 def get_file_from_gcs(gcs_file_name):
     """Get a file from GCS or local file system if GCS is unavailable."""
     if storage_client:
         try:
             bucket = storage_client.bucket(BUCKET_NAME)
             blob = bucket.blob(f"{LOGO_FOLDER}{gcs_file_name}")
-            
-            if not blob.exists():
+
+            # One GET does the work of the old exists() + reload() +
+            # download sequence; a missing blob surfaces as NotFound.
+            try:
+                file_data = blob.download_as_bytes()
+            except exceptions.NotFound:
                 print(f"File {gcs_file_name} does not exist in GCS")
                 raise FileNotFoundError(f"File {gcs_file_name} not found in GCS")
-            
-            # Get blob metadata before downloading
-            blob.reload()
-            print(f"GCS Debug: Blob metadata - Content-Type: {blob.content_type}, Size: {blob.size}, Updated: {blob.updated}")
-                
-            file_data = blob.download_as_bytes()
+
             print(f"Successfully downloaded {len(file_data)} bytes from GCS: {gcs_file_name}")
-            
-            # Debug: Check first few bytes to verify image header
-            if len(file_data) > 20:
-                first_bytes = ', '.join(f'{b:02x}' for b in file_data[:20])
-                print(f"GCS Debug: First 20 bytes of downloaded data: {first_bytes}")
-                
-                # Check for common image headers
-                png_signature = b'\x89PNG\r\n\x1a\n'
-                jpg_signature = b'\xff\xd8\xff'
-                if file_data.startswith(png_signature):
-                    print("GCS Debug: Data has valid PNG signature")
-                elif file_data.startswith(jpg_signature):
-                    print("GCS Debug: Data has valid JPEG signature")
-                else:
-                    print("GCS Debug: Data does not start with standard PNG or JPEG signatures")
-            
             return file_data
         except (exceptions.GoogleCloudError, PermissionError) as e:
             print(f"GCS download failed: {e}. Falling back to local file system.")
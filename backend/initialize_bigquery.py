@@ -1,4 +1,6 @@
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
 from dotenv import load_dotenv
@@ -12,6 +14,10 @@ LOCATION = "US"
 # SQL_FILE_PATH is relative to the workspace root, where the script is expected to be run from.
 SQL_FILE_PATH = "./bigquery_setup.sql"
 
+# Placeholders substituted into the setup SQL; one re.sub pass replaces both
+# in a single new string instead of two full-copy str.replace calls.
+_PH_RE = re.compile(r"\{\{(PROJECT_ID|DATASET_ID)\}\}")
+
 def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str, location: str):
     """Creates a BigQuery dataset if it does not already exist."""
     full_dataset_id = f"{client.project}.{dataset_id}"
@@ -33,6 +39,46 @@ def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str, locat
         raise
 
 
+def split_sql_statements(sql_content: str):
+    """Yields the statements of a SQL script, splitting on top-level ';' only.
+
+    Unlike a plain str.split(';'), semicolons inside 'single'/"double" quoted
+    literals, -- line comments and /* block */ comments do not end a
+    statement. Single-pass; statements are yielded stripped and non-empty.
+    """
+    start = 0
+    i = 0
+    n = len(sql_content)
+    while i < n:
+        ch = sql_content[i]
+        if ch == "'" or ch == '"':
+            quote = ch
+            i += 1
+            while i < n:
+                if sql_content[i] == "\\":
+                    i += 2
+                    continue
+                if sql_content[i] == quote:
+                    break
+                i += 1
+        elif ch == "-" and sql_content.startswith("--", i):
+            i = sql_content.find("\n", i)
+            if i == -1:
+                break
+        elif ch == "/" and sql_content.startswith("/*", i):
+            end = sql_content.find("*/", i + 2)
+            i = n if end == -1 else end + 1
+        elif ch == ";":
+            statement = sql_content[start:i].strip()
+            if statement:
+                yield statement
+            start = i + 1
+        i += 1
+    tail = sql_content[start:].strip()
+    if tail:
+        yield tail
+
+
 def execute_sql_from_file(client: bigquery.Client, sql_file_path: str, project_id: str, dataset_id: str):
     """Reads SQL from a file, replaces placeholders, and executes statements."""
     print(f"\nAttempting to read SQL file from: {os.path.abspath(sql_file_path)}")
@@ -50,20 +96,59 @@ def execute_sql_from_file(client: bigquery.Client, sql_file_path: str, project_i
 
     try:
         # Replace placeholders
-        sql_content = sql_content.replace("{{PROJECT_ID}}", project_id)
-        sql_content = sql_content.replace("{{DATASET_ID}}", dataset_id)
+        mapping = {"PROJECT_ID": project_id, "DATASET_ID": dataset_id}
+        sql_content = _PH_RE.sub(lambda m: mapping[m.group(1)], sql_content)
 
-        # Split into individual statements
-        # Handles statements separated by ';' and filters out empty ones.
-        statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
+        # Split into individual statements, respecting quoted literals and
+        # comments so embedded semicolons don't truncate a statement.
+        statements = list(split_sql_statements(sql_content))
 
         if not statements:
             print(f"No SQL statements found in {sql_file_path} after processing.")
             return
 
+        # Submit the whole file as one multi-statement script first: one job
+        # and one round-trip instead of one per statement. Fall back to the
+        # per-statement loop on failure so the offending statement is named.
+        print(f"\nExecuting {len(statements)} SQL statement(s) from {sql_file_path} as a single script...")
+        try:
+            query_job = client.query(sql_content)
+            query_job.result()  # Wait for the whole script to complete
+            print("\nAll SQL statements executed successfully.")
+            return
+        except Exception as e:
+            print(f"Script-level execution failed: {e}")
+            print("Falling back to per-statement execution to localize the error.")
+
+        # CREATE TABLE statements are independent of each other, so run them
+        # concurrently (capped at 10 jobs to stay under BigQuery's concurrent
+        # request limits); everything else (INSERTs depend on the tables)
+        # runs sequentially afterwards in file order.
+        ddl_statements = [s for s in statements if s.upper().startswith("CREATE")]
+        other_statements = [s for s in statements if not s.upper().startswith("CREATE")]
+
         print(f"\nExecuting {len(statements)} SQL statement(s) from {sql_file_path}:")
-        for i, statement in enumerate(statements):
-            print(f"\nExecuting statement {i+1}/{len(statements)}:")
+        if ddl_statements:
+            print(f"Running {len(ddl_statements)} CREATE statement(s) in parallel...")
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = {
+                    executor.submit(lambda s: client.query(s).result(), statement): statement
+                    for statement in ddl_statements
+                }
+                for future in as_completed(futures):
+                    statement = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error executing CREATE statement: {e}")
+                        print(f"Failed SQL: {statement}")
+                        for pending in futures:
+                            pending.cancel()
+                        raise  # Stop execution on first error
+            print(f"Successfully executed {len(ddl_statements)} CREATE statement(s).")
+
+        for i, statement in enumerate(other_statements):
+            print(f"\nExecuting statement {i+1}/{len(other_statements)}:")
             # Print first few characters of statement for brevity in logs
             print(f"SQL: {statement[:200]}{'...' if len(statement) > 200 else ''}")
             try:
@@ -1,4 +1,4 @@
-from bigquery_functions import GLOBAL_LOG_STORE
+from bigquery_functions import GLOBAL_LOG_STORE, LogStore
 from gemini_tools import (
     banking_tool,
     getBalance,
@@ -15,29 +15,46 @@ from gemini_tools import (
 )
 from gcs_utils import (
     upload_bytes_to_gcs,
-    file_exists_in_gcs,
-    get_file_from_gcs
+    get_file_from_gcs,
+    get_blob_generation
 )
 from datetime import datetime, timezone  # For timestamping raw stdout logs
+from types import MappingProxyType
 import asyncio
+import contextlib
+import time
 import os
-import traceback
 import uuid  # Added for generating unique IDs
 import sys  # Added for stdout redirection
 import io  # Added for stdout redirection
+import hashlib
 import json  # Added for parsing log strings
+import logging
 from PIL import Image  # For image processing
 from quart import Quart, websocket, jsonify, request, Response
 from quart_cors import cors
 import google.genai as genai
-import extcolors
 from google.genai import types
 from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+try:
+    import msgspec.json as msgspec_json
+except ImportError:  # pragma: no cover - optional accelerator
+    msgspec_json = None
 load_dotenv()
 
 
 # --- Log Capturing Setup ---
-CAPTURED_STDOUT_LOGS = []
+# Bounded ring buffer of (unix_timestamp, raw_line) tuples. Only lines that
+# pass a cheap substring fast-reject (could this be a TOOL_EVENT JSON blob?)
+# are stored at all; everything else still reaches the console but never
+# touches the buffer, so ordinary debug prints pay just a strip and two
+# substring scans. The actual JSON parse is deferred to /api/logs, and the
+# maxlen caps memory growth under long sessions.
+CAPTURED_STDOUT_LOGS = LogStore(maxlen=10000)
 _original_stdout = sys.stdout
 
 
@@ -49,33 +66,39 @@ class StdoutTee(io.TextIOBase):
     def write(self, s):
         self._original_stdout.write(s)  # Write to original stdout (console)
         s_stripped = s.strip()
-        if s_stripped:  # Avoid empty lines
-            try:
-                # Attempt to parse as JSON, assuming logs from gemini_tools are JSON strings
-                log_entry = json.loads(s_stripped)
-                # Ensure it has the expected structure for frontend if it's a TOOL_EVENT
-                if isinstance(log_entry, dict) and log_entry.get("log_type") == "TOOL_EVENT":
-                    self._log_list.append(log_entry)
-                else:  # Not a TOOL_EVENT or not a dict, store as raw with context
-                    self._log_list.append({
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                        "log_type": "RAW_STDOUT",
-                        "message": s_stripped,
-                        "parsed_json": log_entry if isinstance(log_entry, dict) else None
-                    })
-            except json.JSONDecodeError:
-                # If it's not JSON, store it as a raw string entry
-                self._log_list.append({
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "log_type": "RAW_STDOUT",
-                    "message": s_stripped
-                })
+        if (
+            s_stripped
+            and s_stripped[0] == '{'
+            and '"log_type"' in s_stripped
+            and '"TOOL_EVENT"' in s_stripped
+        ):
+            self._log_list.append((time.time(), s_stripped))
         return len(s)
 
     def flush(self):
         self._original_stdout.flush()
 
 
+def _materialize_stdout_log(timestamp, line):
+    """Converts a captured stdout line into a structured log entry.
+
+    StdoutTee.write's fast-reject means every stored line already looks
+    like a TOOL_EVENT JSON blob, so the parse here almost never fails; the
+    RAW_STDOUT fallback only covers false positives of the substring check.
+    """
+    try:
+        log_entry = json.loads(line)
+        if isinstance(log_entry, dict) and log_entry.get("log_type") == "TOOL_EVENT":
+            return log_entry
+    except json.JSONDecodeError:
+        pass
+    return {
+        "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+        "log_type": "RAW_STDOUT",
+        "message": line
+    }
+
+
 sys.stdout = StdoutTee(_original_stdout, CAPTURED_STDOUT_LOGS)
 # --- End Log Capturing Setup ---
 
@@ -87,13 +110,157 @@ gemini_client = genai.Client(
 GEMINI_MODEL_NAME = "gemini-live-2.5-flash"
 INPUT_SAMPLE_RATE = 16000
 
+# Constant parts of the Live API session config, built once at import.
+# Each connection only adds its own session_resumption handle; the shared
+# sub-objects are never mutated after construction.
+_BASE_LIVE_CONFIG_KWARGS = dict(
+    response_modalities=["AUDIO"],
+    system_instruction="You are helpful assistant for banking services. You are currently interacting with a user who is using a voice-based interface to interact with you. You should respond to the user's voice commands in a natural and conversational manner.You should not use any emojis or special characters.\
+            Your `user_id` is `Alex` and your bill provider is `City Power`. You will detect the language of the user and respond in the same language. ",
+    speech_config=types.SpeechConfig(
+        language_code="en-US"
+    ),
+    input_audio_transcription={},
+    output_audio_transcription={},
+    context_window_compression=types.ContextWindowCompressionConfig(  # Added from reference
+        sliding_window=types.SlidingWindow(),
+    ),
+    tools=[banking_tool],
+)
+
+# Reused for every SEND_TEST_AUDIO_PLEASE sentinel instead of rebuilding
+# the same Content/Part pair per message.
+_TEST_AUDIO_CONTENT = types.Content(
+    role="user",
+    parts=[types.Part(text="Hello Gemini, please say 'testing one two three'.")]
+)
+
+# Read-only dispatch table for Gemini tool calls, built once instead of
+# per websocket connection.
+_TOOL_DISPATCH = MappingProxyType({
+    "getBalance": getBalance,
+    "getTransactionHistory": getTransactionHistory,
+    "initiateFundTransfer": initiateFundTransfer,
+    "executeFundTransfer": executeFundTransfer,
+    "getBillDetails": getBillDetails,
+    "payBill": payBill,
+    "registerBiller": registerBiller,
+    "updateBillerDetails": updateBillerDetails,
+    "removeBiller": removeBiller,
+    "listRegisteredBillers": listRegisteredBillers,
+    "search_faq": search_faq
+})
+
+# Per-tool result memoization for idempotent, read-only tools: TTL in
+# seconds keyed by tool name. Deliberately conservative — account
+# balances, transfers and biller mutations must never serve stale
+# results, so only tools whose answers are static documentation are
+# listed. Entries are (expiry, response_content) keyed by
+# (name, sorted args).
+_TOOL_RESULT_TTLS = {
+    "search_faq": 300.0,
+}
+_TOOL_RESULT_CACHE = {}
+_TOOL_RESULT_CACHE_MAX = 128
+
 app = Quart(__name__)
 app = cors(app, allow_origin="*")
 
+logger = logging.getLogger(__name__)
+
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 
+async def _ws_send_json(obj):
+    """Sends a dict over the active websocket as a JSON text frame.
+
+    Prefers msgspec's C encoder, then orjson's; the decode back to str
+    is required because binary frames on this socket carry audio, so
+    JSON must stay on text frames. Falls back to Quart's send_json when
+    neither accelerator is installed.
+    """
+    if msgspec_json is not None:
+        await websocket.send(msgspec_json.encode(obj).decode())
+    elif orjson is not None:
+        await websocket.send(orjson.dumps(obj).decode())
+    else:
+        await websocket.send_json(obj)
+
+
+# Error-storm guard: at most _ERR_LOG_BUDGET tracebacks are formatted
+# per one-second window; beyond that only the one-line message is
+# logged, so a flapping dependency can't burn CPU walking stacks faster
+# than it fails. The budget refills lazily on the next call.
+_ERR_LOG_BUDGET = 10
+_err_log_state = [_ERR_LOG_BUDGET, 0.0]  # [tokens remaining, window start]
+
+
+def _log_exc(msg, exc=None):
+    """Logs an error with its traceback, rate-limited per second."""
+    now = time.monotonic()
+    if now - _err_log_state[1] >= 1.0:
+        _err_log_state[0] = _ERR_LOG_BUDGET
+        _err_log_state[1] = now
+    if _err_log_state[0] > 0:
+        _err_log_state[0] -= 1
+        logger.error(msg, exc_info=exc if exc is not None else True)
+    else:
+        logger.error(
+            "%s (traceback suppressed: error log budget exhausted)", msg)
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Formats accepted without a conversion warning; frozenset lookup instead
+# of rebuilding a list per upload.
+_ACCEPTED_FORMATS = frozenset({'PNG', 'JPEG', 'JPG', 'WEBP'})
+
+# Process-local caches for the two nearly-static assets served on every
+# page load. Keyed by GCS generation number: a cheap metadata RPC replaces
+# the exists-check + full download when the blob hasn't changed, and
+# upload_logo busts both entries on success.
+_STYLE_CACHE = {"generation": None, "body": None}
+_LOGO_CACHE = {"generation": None, "body": None, "etag": None}
+
+
+def _logo_response(logo_data, etag):
+    """Builds the /api/logo response, honouring If-None-Match.
+
+    A matching client ETag short-circuits to an empty 304, skipping the
+    body entirely for repeat viewers.
+    """
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={
+            "Cache-Control": "public, max-age=300",
+            "ETag": etag
+        })
+    return Response(logo_data, mimetype='image/png', headers={
+        "Cache-Control": "public, max-age=300",
+        "ETag": etag
+    })
+
+
+def _dominant_hex_color(img):
+    """Returns the dominant color of a PIL image as a '#rrggbb' string.
+
+    Thumbnails to at most 128x128 with nearest-neighbour sampling (letting
+    Pillow's reducer skip most of the source pixels), quantizes each
+    channel to 5 bits so near-identical shades share a bin, and picks the
+    most populated bin. All passes run in Pillow's C loops, replacing the
+    pure-Python per-pixel walk extcolors used to do on the full image.
+    """
+    thumb = img.copy()
+    thumb.thumbnail((128, 128), Image.NEAREST)
+    small = thumb.convert('RGB').point(lambda v: v & 0xF8)  # 32 levels/channel
+    thumb.close()
+    colors = small.getcolors(maxcolors=128 * 128)
+    if not colors:
+        raise ValueError("No colors found in image")
+    _, (r, g, b) = max(colors)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
 @app.route("/api/upload-logo", methods=["POST"])
 async def upload_logo():
     """Handles logo file uploads and stores in GCS."""
@@ -112,112 +279,95 @@ async def upload_logo():
             try:
                 # First try the async approach
                 file_content = await file.read()
-                print(
-                    f"Debug: Successfully read file using async approach. Data size: {len(file_content)} bytes")
+                logger.debug(
+                    "Successfully read file using async approach. Data size: %d bytes", len(file_content))
                 # Check first few bytes to verify it's an image
-                if len(file_content) > 20:
-                    first_bytes = ', '.join(
-                        f'{b:02x}' for b in file_content[:20])
-                    print(f"Debug: First 20 bytes (async): {first_bytes}")
+                if len(file_content) > 20 and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("First 20 bytes (async): %s",
+                                 file_content[:20].hex(' '))
             except TypeError as e:
                 if "can't be used in 'await'" in str(e):
                     # If it fails with our specific error, use the sync approach
-                    print(
+                    logger.info(
                         "Falling back to sync file.read() due to Cloud Run compatibility")
                     file.seek(0)
                     file_content = file.read()
-                    print(
-                        f"Debug: Read file using sync approach. Data size: {len(file_content)} bytes")
+                    logger.debug(
+                        "Read file using sync approach. Data size: %d bytes", len(file_content))
                     # Check first few bytes to verify it's an image
-                    if len(file_content) > 20:
-                        first_bytes = ', '.join(
-                            f'{b:02x}' for b in file_content[:20])
-                        print(f"Debug: First 20 bytes (sync): {first_bytes}")
+                    if len(file_content) > 20 and logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("First 20 bytes (sync): %s",
+                                     file_content[:20].hex(' '))
                 else:
                     # If it's a different TypeError, re-raise it
-                    print(f"Debug: Unexpected TypeError: {e}")
+                    logger.error("Unexpected TypeError: %s", e)
                     raise
 
             # Validate image format and content
+            hex_color = "#282c34"  # Default color
             try:
-                # Create PIL Image object from binary data
-                print(
-                    f"Debug: Creating BytesIO object for image validation. Data size: {len(file_content)} bytes")
+                # Sniff the magic bytes first: PNG inputs are uploaded
+                # verbatim, so the only decode they need is the downscaled
+                # one for color extraction — no full-resolution re-encode.
+                is_png = file_content[:8] == PNG_SIGNATURE
+                # BytesIO over a bytes object shares the buffer
+                # copy-on-write, so this does not duplicate the upload.
                 img_io = io.BytesIO(file_content)
-                print(
-                    f"Debug: BytesIO created: {img_io}, position: {img_io.tell()}")
-
-                # Reset position to beginning to ensure proper reading
-                img_io.seek(0)
-                print(
-                    f"Debug: BytesIO position after seek(0): {img_io.tell()}")
 
                 try:
-                    img = Image.open(img_io)
-                    print(
-                        f"Debug: Image opened successfully. Format: {img.format}, Mode: {img.mode}, Size: {img.size}")
-
-                    # Validate image format
-                    if img.format not in ['PNG', 'JPEG', 'JPG']:
-                        print(
-                            f"Warning: Unsupported image format: {img.format}. Converting to PNG.")
-
-                    # Convert to PNG if needed and get bytes
-                    if img.format != 'PNG':
-                        print(
-                            f"Debug: Converting image from {img.format} to PNG")
-                        img_byte_arr = io.BytesIO()
-                        img.save(img_byte_arr, format='PNG')
-                        file_content = img_byte_arr.getvalue()
-                        print(
-                            f"Debug: Converted to PNG. New data size: {len(file_content)} bytes")
+                    # `with` releases the decoded pixel buffer as soon as
+                    # we're done instead of holding it until GC.
+                    with Image.open(img_io) as img:
+                        logger.debug(
+                            "Image opened successfully. Format: %s, Mode: %s, Size: %s", img.format, img.mode, img.size)
+
+                        if not is_png:
+                            # Validate image format
+                            if img.format not in _ACCEPTED_FORMATS:
+                                logger.warning(
+                                    "Unsupported image format: %s. Converting to PNG.", img.format)
+                            logger.debug(
+                                "Converting image from %s to PNG", img.format)
+                            img_byte_arr = io.BytesIO()
+                            # zlib level 1: most of PNG encode CPU is the
+                            # default level-6 deflate; logos compress nearly
+                            # as well at level 1 in a fraction of the time.
+                            img.save(img_byte_arr, format='PNG',
+                                     optimize=False, compress_level=1)
+                            # getvalue() copies the encoded image, but the
+                            # GCS client only accepts str/bytes — a
+                            # memoryview from getbuffer() makes
+                            # upload_from_string raise and the upload fall
+                            # back to local disk.
+                            file_content = img_byte_arr.getvalue()
+                            logger.debug(
+                                "Converted to PNG. New data size: %d bytes", len(file_content))
+
+                        # Extract dominant color directly from PIL Image
+                        try:
+                            hex_color = _dominant_hex_color(img)
+                            logger.debug(
+                                "Successfully extracted dominant color: %s", hex_color)
+                        except (ValueError, TypeError) as color_exc:
+                            logger.warning(
+                                "Error during color extraction: %s", color_exc)
+                        except Exception:
+                            logger.exception(
+                                "Unexpected error during color extraction")
                 except Exception as img_open_err:
-                    print(
-                        f"Debug: Error opening image with PIL: {type(img_open_err).__name__}: {img_open_err}")
+                    logger.error("Error opening image with PIL: %s: %s",
+                                 type(img_open_err).__name__, img_open_err)
                     # Try to get more diagnostic information
-                    img_io.seek(0)
-                    header_bytes = img_io.read(20)
-                    hex_bytes = ' '.join(f'{b:02x}' for b in header_bytes)
-                    print(f"Debug: First 20 bytes of image data: {hex_bytes}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("First 20 bytes of image data: %s",
+                                     bytes(file_content[:20]).hex(' '))
                     raise
 
-                # Extract dominant color directly from PIL Image
-                hex_color = "#282c34"  # Default color
-                try:
-                    # Use extcolors.extract with PIL Image instead of file path
-                    colors, _ = extcolors.extract_from_image(img)
-                    if colors:
-                        dominant_color = colors[0][0]
-                        hex_color = '#%02x%02x%02x' % dominant_color
-                        print(
-                            f"Successfully extracted dominant color: {hex_color}")
-                    else:
-                        print("No colors found in image, using default color.")
-                except IndexError as idx_err:
-                    print(
-                        f"Could not find a dominant color, using default. Error: {idx_err}")
-                except (ValueError, TypeError) as color_exc:
-                    print(f"Error during color extraction: {color_exc}")
-                except Exception as ext_err:
-                    print(
-                        f"Unexpected error during color extraction: {ext_err}")
-                    traceback.print_exc()
-
             except (IOError, SyntaxError) as img_err:
-                print(f"Error processing image: {img_err}")
+                logger.error("Error processing image: %s", img_err)
                 return jsonify({"error": "Invalid image format or corrupted image"}), 400
 
-            # Upload logo directly to GCS from memory
-            gcs_logo_name = "logo.png"
-            try:
-                upload_result = upload_bytes_to_gcs(
-                    file_content, gcs_logo_name, 'image/png')
-                print(f"Logo successfully uploaded to GCS: {upload_result}")
-            except Exception as gcs_err:
-                print(f"Error uploading logo to GCS: {gcs_err}")
-                return jsonify({"error": "Failed to store logo"}), 500
-
-            # Save style info to GCS
+            # Style info derived from the logo
             style_data = {
                 "dominantColor": hex_color,
                 "logoUrl": "/api/logo"
@@ -226,24 +376,41 @@ async def upload_logo():
             # Convert style data to JSON string
             style_json = json.dumps(style_data)
 
-            # Upload style JSON to GCS
+            # The two blobs are independent, so upload them concurrently in
+            # worker threads (the storage client is sync); the critical path
+            # becomes max(T(logo), T(style)) instead of their sum, and the
+            # event loop stays unblocked.
+            gcs_logo_name = "logo.png"
             gcs_style_name = "header_style.json"
-            try:
-                style_upload_result = upload_bytes_to_gcs(
-                    style_json.encode('utf-8'), gcs_style_name, 'application/json')
-                print(
-                    f"Style JSON successfully uploaded to GCS: {style_upload_result}")
-            except Exception as style_err:
-                print(f"Error uploading style JSON to GCS: {style_err}")
+            upload_result, style_upload_result = await asyncio.gather(
+                asyncio.to_thread(upload_bytes_to_gcs,
+                                  file_content, gcs_logo_name, 'image/png'),
+                asyncio.to_thread(upload_bytes_to_gcs,
+                                  style_json.encode('utf-8'), gcs_style_name, 'application/json'),
+                return_exceptions=True
+            )
+            if isinstance(upload_result, BaseException):
+                logger.error("Error uploading logo to GCS: %s", upload_result)
+                return jsonify({"error": "Failed to store logo"}), 500
+            logger.info("Logo successfully uploaded to GCS: %s", upload_result)
+            if isinstance(style_upload_result, BaseException):
+                logger.error(
+                    "Error uploading style JSON to GCS: %s", style_upload_result)
                 return jsonify({"error": "Failed to store style information"}), 500
+            logger.info(
+                "Style JSON successfully uploaded to GCS: %s", style_upload_result)
+
+            # Bust the in-process caches so the next GET re-fetches the
+            # new blobs.
+            _LOGO_CACHE["generation"] = None
+            _STYLE_CACHE["generation"] = None
 
             return jsonify({
                 "message": "Logo uploaded and style generated",
                 "dominantColor": hex_color
             }), 200
-    except Exception as e:
-        print(f"Unhandled error during logo upload: {e}")
-        traceback.print_exc()  # Print full stack trace for debugging
+    except Exception:
+        logger.exception("Unhandled error during logo upload")
         return jsonify({"error": "An internal error occurred"}), 500
 
 
@@ -251,28 +418,40 @@ async def upload_logo():
 async def get_header_style():
     """Serves the header style JSON from GCS."""
     try:
-        # Check if style file exists in GCS
-        if file_exists_in_gcs("header_style.json"):
-            try:
-                # Get style data from GCS
-                style_data = get_file_from_gcs("header_style.json")
-                print("Successfully retrieved header style from GCS")
-                return Response(style_data, mimetype='application/json')
-            except Exception as fetch_err:
-                print(f"Error fetching header style from GCS: {fetch_err}")
-                # Fall back to default style on error
-                print("Falling back to default header style")
+        # One metadata RPC tells us both whether the file exists and
+        # whether the cached copy is still current.
+        generation = get_blob_generation("header_style.json")
+        if generation is not None:
+            style_data = None
+            if _STYLE_CACHE["generation"] == generation:
+                style_data = _STYLE_CACHE["body"]
+            else:
+                try:
+                    # Get style data from GCS
+                    style_data = get_file_from_gcs("header_style.json")
+                    _STYLE_CACHE["body"] = style_data
+                    _STYLE_CACHE["generation"] = generation
+                    logger.debug("Successfully retrieved header style from GCS")
+                except Exception as fetch_err:
+                    logger.error(
+                        "Error fetching header style from GCS: %s", fetch_err)
+                    # Fall back to default style on error
+                    logger.info("Falling back to default header style")
+            if style_data is not None:
+                return Response(style_data, mimetype='application/json', headers={
+                    "Cache-Control": "public, max-age=60",
+                    "ETag": f'"{generation}"'
+                })
         else:
-            print("Header style not found in GCS, using default style")
+            logger.debug("Header style not found in GCS, using default style")
 
         # Return a default style if the file doesn't exist or there was an error
         return jsonify({
             "dominantColor": "#282c34",
             "logoUrl": "/api/logo"
         }), 200
-    except Exception as e:
-        print(f"Unhandled error in get_header_style: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Unhandled error in get_header_style")
         return jsonify({"error": "An internal error occurred"}), 500
 
 
@@ -280,113 +459,133 @@ async def get_header_style():
 async def get_logo():
     """Serves the uploaded logo from GCS."""
     try:
-        # Check if logo exists in GCS
-        if file_exists_in_gcs("logo.png"):
+        # One metadata RPC covers both the existence check and the
+        # cached-copy freshness check.
+        generation = get_blob_generation("logo.png")
+        if generation is not None:
+            if _LOGO_CACHE["generation"] == generation:
+                return _logo_response(_LOGO_CACHE["body"], _LOGO_CACHE["etag"])
             try:
                 # Get logo data from GCS
                 logo_data = get_file_from_gcs("logo.png")
-                print("Successfully retrieved logo from GCS")
-                print(
-                    f"Debug: Logo data type: {type(logo_data)}, size: {len(logo_data)} bytes")
+                logger.debug("Retrieved logo from GCS: %d bytes",
+                             len(logo_data))
 
-                # Validate the image data
+                # Validate the image data. verify() checks the headers and
+                # checksums without decoding pixel data, and the with block
+                # releases the file handle immediately. Cached copies were
+                # validated when first downloaded.
                 try:
-                    img_io = io.BytesIO(logo_data)
-                    print(
-                        f"Debug: BytesIO created: {img_io}, tell position: {img_io.tell()}")
-
-                    # Reset position to beginning just to be safe
-                    img_io.seek(0)
-                    print(
-                        f"Debug: BytesIO position after seek(0): {img_io.tell()}")
-
-                    try:
-                        img = Image.open(img_io)
-                        print(
-                            f"Debug: Image opened successfully. Format: {img.format}, Mode: {img.mode}, Size: {img.size}")
-                    except Exception as detailed_err:
-                        print(
-                            f"Debug: Detailed error opening image: {type(detailed_err).__name__}: {detailed_err}")
-                        # Try to get more diagnostic information
-                        img_io.seek(0)
-                        header_bytes = img_io.read(20)
-                        hex_bytes = ' '.join(f'{b:02x}' for b in header_bytes)
-                        print(
-                            f"Debug: First 20 bytes of image data: {hex_bytes}")
-                        raise
-                except (IOError, SyntaxError) as img_validate_err:
-                    print(
-                        f"Retrieved logo data is not a valid image: {img_validate_err}")
+                    with Image.open(io.BytesIO(logo_data)) as img:
+                        logger.debug(
+                            "Image opened successfully. Format: %s, Size: %s", img.format, img.size)
+                        img.verify()
+                except Exception as img_validate_err:
+                    logger.error("Retrieved logo data is not a valid image: %s: %s",
+                                 type(img_validate_err).__name__, img_validate_err)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("First 20 bytes of image data: %s",
+                                     logo_data[:20].hex(' '))
                     return jsonify({"error": "Retrieved logo is not a valid image"}), 500
 
-                return Response(logo_data, mimetype='image/png')
-            except Exception as fetch_err:
-                print(f"Error fetching logo from GCS: {fetch_err}")
-                traceback.print_exc()
+                # Content-based ETag, hashed once per download and cached
+                # with the bytes.
+                etag = f'"{hashlib.blake2b(logo_data, digest_size=8).hexdigest()}"'
+                _LOGO_CACHE["body"] = logo_data
+                _LOGO_CACHE["generation"] = generation
+                _LOGO_CACHE["etag"] = etag
+                return _logo_response(logo_data, etag)
+            except Exception:
+                logger.exception("Error fetching logo from GCS")
                 return jsonify({"error": "Failed to retrieve logo"}), 500
         else:
             # If logo is not found, return a 404
-            print("Logo not found in GCS")
+            logger.debug("Logo not found in GCS")
             return jsonify({"error": "Logo not found"}), 404
-    except Exception as e:
-        print(f"Unhandled error in get_logo: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Unhandled error in get_logo")
         return jsonify({"error": "An internal error occurred"}), 500
 
 
 @app.websocket("/listen")
 async def websocket_endpoint():
     # print("Quart WebSocket: Connection accepted from client.")
-    current_session_handle = None  # Initialize session handle
-
-    language_code_to_use = "en-US"
-
-    gemini_live_config = types.LiveConnectConfig(
-        response_modalities=["AUDIO"],
-        system_instruction="You are helpful assistant for banking services. You are currently interacting with a user who is using a voice-based interface to interact with you. You should respond to the user's voice commands in a natural and conversational manner.You should not use any emojis or special characters.\
-            Your `user_id` is `Alex` and your bill provider is `City Power`. You will detect the language of the user and respond in the same language. ",
-        speech_config=types.SpeechConfig(
-            language_code=language_code_to_use
-        ),
-        input_audio_transcription={},
-        output_audio_transcription={},
-        session_resumption=types.SessionResumptionConfig(
-            handle=current_session_handle),  # Added from reference
-        context_window_compression=types.ContextWindowCompressionConfig(  # Added from reference
-            sliding_window=types.SlidingWindow(),
-        ),
-        tools=[banking_tool],
-    )
+    # Guards the teardown close so it is attempted exactly once.
+    ws_close_initiated = False
+    # Resume a previous Live session when this client presents the handle
+    # the server echoed to it earlier; None means a fresh session. The
+    # handle is per-client (query parameter), not process-global, so
+    # concurrent connections cannot resume or clobber each other's
+    # sessions.
+    current_session_handle = websocket.args.get("session_handle") or None
 
     try:
-        async with gemini_client.aio.live.connect(
-            model=GEMINI_MODEL_NAME,
-            config=gemini_live_config
-        ) as session:
+        async with contextlib.AsyncExitStack() as stack:
+            try:
+                session = await stack.enter_async_context(
+                    gemini_client.aio.live.connect(
+                        model=GEMINI_MODEL_NAME,
+                        config=types.LiveConnectConfig(
+                            session_resumption=types.SessionResumptionConfig(
+                                handle=current_session_handle),
+                            **_BASE_LIVE_CONFIG_KWARGS,
+                        )))
+            except Exception as connect_exc:
+                if current_session_handle is None:
+                    raise
+                # A stale or invalidated resumption handle must not wedge
+                # the endpoint: drop it and connect a fresh session.
+                logger.warning(
+                    "Quart Backend: Resuming Live session failed (%r); retrying with a fresh session.", connect_exc)
+                current_session_handle = None
+                session = await stack.enter_async_context(
+                    gemini_client.aio.live.connect(
+                        model=GEMINI_MODEL_NAME,
+                        config=types.LiveConnectConfig(
+                            session_resumption=types.SessionResumptionConfig(
+                                handle=None),
+                            **_BASE_LIVE_CONFIG_KWARGS,
+                        )))
             # print(f"Quart Backend: Gemini session connected for model {GEMINI_MODEL_NAME} with tools.")
             active_processing = True
+            # Set when either task stops; lets the input task block on
+            # websocket.receive() indefinitely instead of waking every
+            # 200ms just to re-check active_processing.
+            shutdown_event = asyncio.Event()
 
             async def handle_client_input_and_forward():
                 nonlocal active_processing
                 # print("Quart Backend: Starting handle_client_input_and_forward task.")
+                shutdown_waiter = asyncio.create_task(
+                    shutdown_event.wait(), name="ShutdownWaiter")
                 try:
                     while active_processing:
+                        recv_task = asyncio.create_task(websocket.receive())
+                        done, _ = await asyncio.wait(
+                            {recv_task, shutdown_waiter},
+                            return_when=asyncio.FIRST_COMPLETED)
+                        if recv_task not in done:
+                            # Shutdown was signalled while we were waiting.
+                            recv_task.cancel()
+                            try:
+                                await recv_task
+                            except (asyncio.CancelledError, Exception):
+                                pass
+                            break
                         try:
-                            client_data = await asyncio.wait_for(websocket.receive(), timeout=0.2)
+                            client_data = recv_task.result()
 
                             if isinstance(client_data, str):
                                 message_text = client_data
                                 # print(f"Quart Backend: Received text from client: '{message_text}'")
-                                prompt_for_gemini = message_text
                                 if message_text == "SEND_TEST_AUDIO_PLEASE":
-                                    prompt_for_gemini = "Hello Gemini, please say 'testing one two three'."
-
-                                # print(f"Quart Backend: Sending text prompt to Gemini: '{prompt_for_gemini}'")
-                                user_content_for_text = types.Content(
-                                    role="user",
-                                    parts=[
-                                        types.Part(text=prompt_for_gemini)]
-                                )
+                                    user_content_for_text = _TEST_AUDIO_CONTENT
+                                else:
+                                    user_content_for_text = types.Content(
+                                        role="user",
+                                        parts=[
+                                            types.Part(text=message_text)]
+                                    )
                                 await session.send_client_content(turns=user_content_for_text)
                                 # print(f"Quart Backend: Prompt '{prompt_for_gemini}' sent to Gemini.")
 
@@ -406,300 +605,444 @@ async def websocket_endpoint():
                                 print(
                                     f"Quart Backend: Received unexpected data type from client: {type(client_data)}, content: {client_data[:100] if isinstance(client_data, bytes) else client_data}")
 
-                        except asyncio.TimeoutError:
-                            if not active_processing:
-                                break
-                            continue  # Normal timeout, continue listening
                         except Exception as e_fwd_inner:
-                            print(
+                            _log_exc(
                                 f"Quart Backend: Error during client data handling/sending to Gemini: {type(e_fwd_inner).__name__}: {e_fwd_inner}")
-                            traceback.print_exc()
                             active_processing = False
                             break  # Exit while loop on error
                 except Exception as e_fwd_outer:
-                    print(
+                    _log_exc(
                         f"Quart Backend: Outer error in handle_client_input_and_forward: {type(e_fwd_outer).__name__}: {e_fwd_outer}")
-                    traceback.print_exc()
                     # Ensure outer errors also stop processing
                     active_processing = False
                 finally:
                     # print("Quart Backend: Stopped handling client input.")
                     active_processing = False  # Ensure graceful shutdown of the other task
+                    shutdown_event.set()
+                    shutdown_waiter.cancel()
 
             async def receive_from_gemini_and_forward_to_client():
                 nonlocal active_processing, current_session_handle
                 # print("Quart Backend: Starting receive_from_gemini_and_forward_to_client task.")
 
-                available_functions = {
-                    "getBalance": getBalance,
-                    "getTransactionHistory": getTransactionHistory,
-                    "initiateFundTransfer": initiateFundTransfer,
-                    "executeFundTransfer": executeFundTransfer,
-                    "getBillDetails": getBillDetails,
-                    "payBill": payBill,
-                    "registerBiller": registerBiller,
-                    "updateBillerDetails": updateBillerDetails,
-                    "removeBiller": removeBiller,
-                    "listRegisteredBillers": listRegisteredBillers,
-                    "search_faq": search_faq
-                }
                 current_user_utterance_id = None
-                # Renamed from latest_user_speech_text and initialized
-                accumulated_user_speech_text = ""
+                # Chunks are collected in lists and joined only when a
+                # payload is actually built (debounced partials and finals),
+                # so a token no longer pays for re-serializing the whole
+                # utterance-so-far. The frontend consumes full-text
+                # snapshots keyed by utterance id, so the wire format is
+                # unchanged.
+                user_speech_parts = []
                 current_model_utterance_id = None
-                accumulated_model_speech_text = ""
+                model_speech_parts = []
+                # One payload dict per utterance, mutated in place by the
+                # snapshot builders and the final send instead of
+                # rebuilding a 5-key literal per flush.
+                user_payload = None
+                model_payload = None
+
+                # Bound once: orjson-backed encoder plus the other hot
+                # callables, so the per-response loop does LOAD_FAST
+                # instead of global/attribute lookups.
+                send_json = _ws_send_json
+                ws_send = websocket.send
+                send_tool_response = session.send_tool_response
+                FunctionResponse = types.FunctionResponse
+
+                # Streaming transcription updates are debounced: each chunk
+                # marks its utterance dirty and a single timer task builds
+                # and flushes the latest snapshot after 30ms, so a burst of
+                # tokens costs one join + one websocket send instead of one
+                # per token. Finals bypass the debounce and are sent inline.
+                TRANSCRIPT_DEBOUNCE_SECONDS = 0.03
+                pending_transcripts = {}
+                transcript_flush_tasks = {}
+
+                # Only the first send failure per connection is logged;
+                # during a disconnect burst every outstanding partial hits
+                # the same error path and would otherwise format the same
+                # message O(pending) times.
+                send_failed = False
+
+                def _note_send_failure(context, send_exc):
+                    nonlocal send_failed, active_processing
+                    if not send_failed:
+                        send_failed = True
+                        logger.warning(
+                            "Quart Backend: Error sending %s to client: %r", context, send_exc)
+                    active_processing = False
+
+                async def _flush_transcript_after_debounce(key):
+                    try:
+                        await asyncio.sleep(TRANSCRIPT_DEBOUNCE_SECONDS)
+                        build_payload = pending_transcripts.pop(key, None)
+                        transcript_flush_tasks.pop(key, None)
+                        if build_payload is not None and active_processing:
+                            payload = build_payload()
+                            if payload is not None:
+                                await send_json(payload)
+                    except asyncio.CancelledError:
+                        pass
+                    except Exception as send_exc:
+                        _note_send_failure(
+                            f"{key} transcription update", send_exc)
+
+                def _queue_transcript_update(key, build_payload):
+                    pending_transcripts[key] = build_payload
+                    if key not in transcript_flush_tasks:
+                        transcript_flush_tasks[key] = asyncio.create_task(
+                            _flush_transcript_after_debounce(key))
+
+                def _build_user_snapshot():
+                    if current_user_utterance_id is None or not user_speech_parts:
+                        return None
+                    user_payload['text'] = "".join(user_speech_parts)
+                    return user_payload
+
+                def _build_model_snapshot():
+                    if current_model_utterance_id is None or not model_speech_parts:
+                        return None
+                    model_payload['text'] = "".join(model_speech_parts)
+                    return model_payload
+
+                def _drop_pending_transcript(key):
+                    task = transcript_flush_tasks.pop(key, None)
+                    if task is not None:
+                        task.cancel()
+                    pending_transcripts.pop(key, None)
+
+                async def _flush_pending_transcripts():
+                    # Uncork: send every debounced partial immediately
+                    # instead of waiting out its timer. Used at control
+                    # boundaries (turn/generation complete, interrupt) so
+                    # the client is current before finals or interrupt
+                    # signals arrive, and no partial fires 30ms late with
+                    # stale state.
+                    for key in list(pending_transcripts):
+                        task = transcript_flush_tasks.pop(key, None)
+                        if task is not None:
+                            task.cancel()
+                        build_payload = pending_transcripts.pop(key, None)
+                        if build_payload is None or not active_processing:
+                            continue
+                        payload = build_payload()
+                        if payload is None:
+                            continue
+                        try:
+                            await send_json(payload)
+                        except Exception as send_exc:
+                            _note_send_failure(
+                                f"flushed {key} transcription update", send_exc)
+                            return
 
                 try:
+                    # session.receive() is a true async iterator: it
+                    # suspends on the underlying socket until a message
+                    # arrives and returns at turn boundaries, so the outer
+                    # while simply re-enters it per turn — no polling
+                    # sleep needed between iterations.
                     while active_processing:
-                        had_gemini_activity_in_this_iteration = False
                         async for response in session.receive():
-                            had_gemini_activity_in_this_iteration = True
                             if not active_processing:
                                 break
 
+                            # Audio chunks dominate message volume, so the
+                            # PCM forward is the first branch and skips the
+                            # rest of the ladder entirely. Session handles
+                            # arrive on dedicated control messages without
+                            # audio, so the early continue never drops one.
+                            data = response.data
+                            if data is not None:
+                                try:
+                                    await ws_send(data)
+                                except Exception as send_exc:
+                                    _note_send_failure(
+                                        "audio data", send_exc)
+                                    break
+                                continue
+
                             if response.session_resumption_update:
                                 update = response.session_resumption_update
                                 if update.resumable and update.new_handle:
                                     current_session_handle = update.new_handle
-                                    # print(f"Quart Backend: Received session resumption update. New handle: {current_session_handle}")
-
-                            if hasattr(response, 'session_handle') and response.session_handle:
-                                new_handle = response.session_handle
+                                    # Echo the handle to this client so it
+                                    # can resume its own session on
+                                    # reconnect (?session_handle=...).
+                                    await send_json({
+                                        "type": "session_handle_update",
+                                        "handle": current_session_handle})
+
+                            new_handle = getattr(
+                                response, 'session_handle', None)
+                            if new_handle:
                                 if new_handle != current_session_handle:
                                     current_session_handle = new_handle
-                                    # print(f"Quart Backend: Updated session handle from direct response.session_handle: {current_session_handle}")
-
-                            if response.data is not None:
-                                try:
-                                    await websocket.send(response.data)
-                                except Exception as send_exc:
-                                    print(
-                                        f"Quart Backend: Error sending audio data to client WebSocket: {type(send_exc).__name__}: {send_exc}")
-                                    active_processing = False
-                                    break
+                                    await send_json({
+                                        "type": "session_handle_update",
+                                        "handle": current_session_handle})
+
+                            if response.server_content:
+                                # One getattr snapshot per response; the
+                                # branches below test these locals instead of
+                                # re-walking hasattr/attribute chains three
+                                # times per token.
+                                sc = response.server_content
+                                input_tr = getattr(
+                                    sc, 'input_transcription', None)
+                                input_text = getattr(
+                                    input_tr, 'text', None) if input_tr else None
+                                output_tr = getattr(
+                                    sc, 'output_transcription', None)
+                                output_text = getattr(
+                                    output_tr, 'text', None) if output_tr else None
+                                generation_complete = bool(
+                                    getattr(sc, 'generation_complete', False))
+                                turn_complete = bool(
+                                    getattr(sc, 'turn_complete', False))
+                                interrupted = bool(
+                                    getattr(sc, 'interrupted', False))
+
+                                if generation_complete or turn_complete or interrupted:
+                                    # Control boundary: uncork debounced
+                                    # partials before finals/interrupts.
+                                    await _flush_pending_transcripts()
+                                    if not active_processing:
+                                        break
 
-                            elif response.server_content:
-                                if response.server_content.interrupted:
-                                    print(
-                                        "!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-                                    print(
+                                if interrupted:
+                                    logger.info(
                                         "Quart Backend: Gemini server sent INTERRUPTED signal.")
-                                    print(
-                                        "!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
                                     try:
-                                        await websocket.send_json({"type": "interrupt_playback"})
+                                        await send_json({"type": "interrupt_playback"})
                                         # print("Quart Backend: Sent interrupt_playback signal to client.")
                                     except Exception as send_exc:
-                                        print(
-                                            f"Quart Backend: Error sending interrupt_playback signal to client: {type(send_exc).__name__}: {send_exc}")
-                                        active_processing = False
+                                        _note_send_failure(
+                                            "interrupt_playback signal", send_exc)
                                         break
 
                                 # User Input Processing
-                                if response.server_content and hasattr(response.server_content, 'input_transcription') and \
-                                   response.server_content.input_transcription and \
-                                   hasattr(response.server_content.input_transcription, 'text') and \
-                                   response.server_content.input_transcription.text:  # Ensure text is not empty
-
-                                    user_speech_chunk = response.server_content.input_transcription.text
-
+                                if input_text:  # Ensure text is not empty
                                     if current_user_utterance_id is None:  # Start of a new user utterance
                                         current_user_utterance_id = str(
                                             uuid.uuid4())
                                         # Reset accumulator for new utterance
-                                        accumulated_user_speech_text = ""
-
-                                    accumulated_user_speech_text += user_speech_chunk
-
-                                    if accumulated_user_speech_text:  # Only send if there's actual accumulated text
-                                        payload = {
+                                        user_speech_parts = []
+                                        user_payload = {
                                             'id': current_user_utterance_id,
-                                            # Send accumulated text
-                                            'text': accumulated_user_speech_text,
+                                            'text': '',
                                             'sender': 'user',
                                             'type': 'user_transcription_update',
                                             'is_final': False
                                         }
-                                        try:
-                                            await websocket.send_json(payload)
-                                            print(
-                                                f"Backend - Streaming User Input (accumulated): \033[92m{accumulated_user_speech_text}\033[0m")
-                                        except Exception as send_exc:
-                                            print(
-                                                f"Quart Backend: Error sending user transcription update to client: {type(send_exc).__name__}: {send_exc}")
-                                            active_processing = False
-                                            break
 
-                                # Model Output Processing
-                                if response.server_content and hasattr(response.server_content, 'output_transcription') and \
-                                   response.server_content.output_transcription and \
-                                   hasattr(response.server_content.output_transcription, 'text') and \
-                                   response.server_content.output_transcription.text:
+                                    user_speech_parts.append(input_text)
+                                    _queue_transcript_update(
+                                        'user', _build_user_snapshot)
 
+                                # Model Output Processing
+                                if output_text:
                                     if current_model_utterance_id is None:
                                         current_model_utterance_id = str(
                                             uuid.uuid4())
                                         # Ensure accumulator is clear
-                                        accumulated_model_speech_text = ""
-
-                                    chunk = response.server_content.output_transcription.text
-                                    if chunk:  # Only process if chunk has content
-                                        accumulated_model_speech_text += chunk
-                                        payload = {
+                                        model_speech_parts = []
+                                        model_payload = {
                                             'id': current_model_utterance_id,
-                                            # Send accumulated text
-                                            'text': accumulated_model_speech_text,
+                                            'text': '',
                                             'sender': 'model',
                                             'type': 'model_response_update',
                                             'is_final': False
                                         }
-                                        try:
-                                            await websocket.send_json(payload)
-                                            print(
-                                                f"Backend - Streaming Model Output (accumulated): \033[92m{accumulated_model_speech_text}\033[0m")
-                                        except Exception as send_exc:
-                                            print(
-                                                f"Quart Backend: Error sending model response update to client: {type(send_exc).__name__}: {send_exc}")
-                                            active_processing = False
-                                            break
+
+                                    model_speech_parts.append(output_text)
+                                    _queue_transcript_update(
+                                        'model', _build_model_snapshot)
 
                                 # Handling Model Generation Completion
-                                if response.server_content and hasattr(response.server_content, 'generation_complete') and \
-                                   response.server_content.generation_complete == True:
-                                    if current_model_utterance_id and accumulated_model_speech_text:  # Ensure there was a model utterance
-                                        payload = {
-                                            'id': current_model_utterance_id,
-                                            'text': accumulated_model_speech_text,
-                                            'sender': 'model',
-                                            'type': 'model_response_update',
-                                            'is_final': True
-                                        }
+                                if generation_complete:
+                                    if current_model_utterance_id and model_speech_parts:  # Ensure there was a model utterance
+                                        final_model_text = "".join(
+                                            model_speech_parts)
+                                        model_payload['text'] = final_model_text
+                                        model_payload['is_final'] = True
                                         try:
-                                            await websocket.send_json(payload)
-                                            print(
-                                                f"Backend - Final Model Output Sent: \033[92m{accumulated_model_speech_text}\033[0m")
+                                            await send_json(model_payload)
+                                            logger.info(
+                                                "Backend - Final Model Output Sent: %s", final_model_text)
                                         except Exception as send_exc:
-                                            print(
-                                                f"Quart Backend: Error sending final model response to client: {type(send_exc).__name__}: {send_exc}")
-                                            active_processing = False
+                                            _note_send_failure(
+                                                "final model response", send_exc)
                                             break
                                     # Reset for next model utterance
                                     current_model_utterance_id = None
-                                    accumulated_model_speech_text = ""
+                                    model_speech_parts = []
 
                                 # Handling Turn Completion (Finalizing User Speech)
-                                if response.server_content and hasattr(response.server_content, 'turn_complete') and \
-                                   response.server_content.turn_complete == True:
-                                    if current_user_utterance_id and accumulated_user_speech_text:  # Ensure there was a user utterance
-                                        payload = {
-                                            'id': current_user_utterance_id,
-                                            # Send final accumulated text
-                                            'text': accumulated_user_speech_text,
-                                            'sender': 'user',
-                                            'type': 'user_transcription_update',
-                                            'is_final': True
-                                        }
+                                if turn_complete:
+                                    if current_user_utterance_id and user_speech_parts:  # Ensure there was a user utterance
+                                        final_user_text = "".join(
+                                            user_speech_parts)
+                                        user_payload['text'] = final_user_text
+                                        user_payload['is_final'] = True
                                         try:
-                                            await websocket.send_json(payload)
-                                            print(
-                                                f"Backend - Final User Input Sent: \033[92m{accumulated_user_speech_text}\033[0m")
+                                            await send_json(user_payload)
+                                            logger.info(
+                                                "Backend - Final User Input Sent: %s", final_user_text)
                                         except Exception as send_exc:
-                                            print(
-                                                f"Quart Backend: Error sending final user transcription to client: {type(send_exc).__name__}: {send_exc}")
-                                            active_processing = False
+                                            _note_send_failure(
+                                                "final user transcription", send_exc)
                                             break
                                     # Reset for next user utterance
                                     current_user_utterance_id = None
-                                    accumulated_user_speech_text = ""  # Reset accumulator
+                                    user_speech_parts = []  # Reset accumulator
                                     # Also reset model states
                                     current_model_utterance_id = None
-                                    accumulated_model_speech_text = ""
-                                    print(
+                                    model_speech_parts = []
+                                    logger.debug(
                                         "Backend - Turn complete. User speech states reset.")
 
                                 # Fallback for other potential text or error structures (simplified)
-                                is_transcription_related = (hasattr(response.server_content, 'input_transcription') and response.server_content.input_transcription) or \
-                                    (hasattr(response.server_content, 'output_transcription')
-                                     and response.server_content.output_transcription)
-                                is_control_signal = (hasattr(response.server_content, 'generation_complete') and response.server_content.generation_complete) or \
-                                    (hasattr(response.server_content, 'turn_complete') and response.server_content.turn_complete) or \
-                                    (hasattr(response.server_content, 'interrupted')
-                                     and response.server_content.interrupted)
-
-                                if not response.data and not is_transcription_related and not is_control_signal:
+                                is_transcription_related = bool(
+                                    input_tr or output_tr)
+                                is_control_signal = generation_complete or turn_complete or interrupted
+
+                                # response.data is None here; the audio fast
+                                # path at the top of the loop continued.
+                                if not is_transcription_related and not is_control_signal:
                                     unhandled_text = None
+                                    model_turn = getattr(
+                                        sc, 'model_turn', None)
                                     if response.text:
                                         unhandled_text = response.text
-                                    elif hasattr(response.server_content, 'model_turn') and response.server_content.model_turn and \
-                                            hasattr(response.server_content.model_turn, 'parts'):
-                                        for part in response.server_content.model_turn.parts:
-                                            if part.text:
-                                                unhandled_text = (
-                                                    unhandled_text + " " if unhandled_text else "") + part.text
-                                    elif hasattr(response.server_content, 'output_text') and response.server_content.output_text:
-                                        unhandled_text = response.server_content.output_text
+                                    elif model_turn and getattr(model_turn, 'parts', None):
+                                        parts_buf = [
+                                            part.text for part in model_turn.parts if part.text]
+                                        if parts_buf:
+                                            unhandled_text = " ".join(
+                                                parts_buf)
+                                    elif getattr(sc, 'output_text', None):
+                                        unhandled_text = sc.output_text
 
                                     if unhandled_text:
-                                        print(
-                                            f"Quart Backend: Received unhandled server_content text: {unhandled_text}")
+                                        logger.debug(
+                                            "Quart Backend: Received unhandled server_content text: %s", unhandled_text)
                                     elif not response.tool_call:
-                                        print(
-                                            f"Quart Backend: Received server_content without primary data or known text parts: {response.server_content}")
+                                        logger.debug(
+                                            "Quart Backend: Received server_content without primary data or known text parts: %s", sc)
 
                             elif response.tool_call:
-                                print(
-                                    f"\033[92mQuart Backend: Received tool_call from Gemini: {response.tool_call}\033[0m")
-                                function_responses = []
-                                for fc in response.tool_call.function_calls:
-                                    print(
-                                        f"\033[92mQuart Backend: Gemini requests function call: {fc.name} with args: {dict(fc.args)}\033[0m")
-
-                                    function_to_call = available_functions.get(
+                                logger.debug(
+                                    "Quart Backend: Received tool_call from Gemini: %s", response.tool_call)
+                                fcs = response.tool_call.function_calls
+                                # Preallocated: every iteration assigns its
+                                # slot, so no append/resize churn.
+                                function_responses = [None] * len(fcs)
+                                # (index, fc, cache_key, cache_ttl, coro)
+                                # for calls that must actually execute;
+                                # they run concurrently below so K I/O-bound
+                                # tools cost one round-trip, not K.
+                                pending_calls = []
+                                for i, fc in enumerate(fcs):
+                                    logger.info(
+                                        "Quart Backend: Gemini requests function call: %s", fc.name)
+
+                                    function_to_call = _TOOL_DISPATCH.get(
                                         fc.name)
-                                    function_response_content = None
+                                    if function_to_call is None:
+                                        print(
+                                            f"Quart Backend: Function {fc.name} not found.")
+                                        function_responses[i] = FunctionResponse(
+                                            id=fc.id,
+                                            name=fc.name,
+                                            response={"status": "error",
+                                                      "message": f"Function {fc.name} not implemented or available."}
+                                        )
+                                        continue
+
+                                    function_args = dict(fc.args)
+                                    logger.debug(
+                                        "Quart Backend: Calling function %s with args: %s", fc.name, function_args)
 
-                                    if function_to_call:
+                                    # Identical repeat calls to whitelisted
+                                    # read-only tools are served from the
+                                    # TTL cache.
+                                    cache_ttl = _TOOL_RESULT_TTLS.get(
+                                        fc.name)
+                                    cache_key = None
+                                    if cache_ttl:
                                         try:
-                                            # Execute the actual local function
-                                            function_args = dict(fc.args)
-                                            print(
-                                                f"\033[92mQuart Backend: Calling function {fc.name} with args: {function_args}\033[0m")
-                                            # Await the async function call
-                                            result = await function_to_call(**function_args)
+                                            cache_key = (fc.name, tuple(
+                                                sorted(function_args.items())))
+                                        except TypeError:
+                                            cache_key = None
+                                    if cache_key is not None:
+                                        cached = _TOOL_RESULT_CACHE.get(
+                                            cache_key)
+                                        if cached is not None and cached[0] > time.monotonic():
+                                            logger.debug(
+                                                "Quart Backend: Function %s served from result cache.", fc.name)
+                                            function_responses[i] = FunctionResponse(
+                                                id=fc.id,
+                                                name=fc.name,
+                                                response=cached[1]
+                                            )
+                                            continue
+
+                                    try:
+                                        coro = function_to_call(
+                                            **function_args)
+                                    except TypeError as e:
+                                        # Bad argument shape surfaces at
+                                        # call time for async functions.
+                                        print(
+                                            f"Quart Backend: Error executing function {fc.name}: {e}")
+                                        function_responses[i] = FunctionResponse(
+                                            id=fc.id,
+                                            name=fc.name,
+                                            response={"status": "error",
+                                                      "message": str(e)}
+                                        )
+                                        continue
+                                    pending_calls.append(
+                                        (i, fc, cache_key, cache_ttl, coro))
+
+                                if pending_calls:
+                                    results = await asyncio.gather(
+                                        *(call[4] for call in pending_calls),
+                                        return_exceptions=True)
+                                    for (i, fc, cache_key, cache_ttl, _), result in zip(pending_calls, results):
+                                        if isinstance(result, BaseException):
+                                            _log_exc(
+                                                f"Quart Backend: Error executing function {fc.name}: {result}", result)
+                                            function_response_content = {
+                                                "status": "error", "message": str(result)}
+                                        else:
                                             if isinstance(result, str):
                                                 function_response_content = {
                                                     "content": result}
                                             else:
                                                 # Assumes result is already a dict if not a string
                                                 function_response_content = result
-                                            print(
-                                                f"\033[92mQuart Backend: Function {fc.name} executed. Result: {result}\033[0m")
-                                        except Exception as e:
-                                            print(
-                                                f"Quart Backend: Error executing function {fc.name}: {e}")
-                                            traceback.print_exc()  # Add if not already there
-                                            function_response_content = {
-                                                "status": "error", "message": str(e)}
-                                    else:
-                                        print(
-                                            f"Quart Backend: Function {fc.name} not found.")
-                                        function_response_content = {"status": "error",
-                                                                     "message": f"Function {fc.name} not implemented or available."}
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id,
-                                        name=fc.name,
-                                        response=function_response_content
-                                    )
-                                    function_responses.append(
-                                        function_response)
+                                            if cache_key is not None:
+                                                if len(_TOOL_RESULT_CACHE) >= _TOOL_RESULT_CACHE_MAX:
+                                                    _TOOL_RESULT_CACHE.clear()
+                                                _TOOL_RESULT_CACHE[cache_key] = (
+                                                    time.monotonic() + cache_ttl,
+                                                    function_response_content)
+                                            logger.debug(
+                                                "Quart Backend: Function %s executed. Result: %s", fc.name, result)
+                                        function_responses[i] = FunctionResponse(
+                                            id=fc.id,
+                                            name=fc.name,
+                                            response=function_response_content
+                                        )
 
                                 if function_responses:
-                                    print(
-                                        f"\033[92mQuart Backend: Sending {len(function_responses)} function response(s) to Gemini.\033[0m")
-                                    await session.send_tool_response(function_responses=function_responses)
+                                    logger.debug(
+                                        "Quart Backend: Sending %d function response(s) to Gemini.", len(function_responses))
+                                    await send_tool_response(function_responses=function_responses)
                                 else:
-                                    print(
+                                    logger.debug(
                                         "Quart Backend: No function responses generated for tool_call.")
 
                             elif hasattr(response, 'error') and response.error:
@@ -709,10 +1052,10 @@ async def websocket_endpoint():
                                 print(
                                     f"Quart Backend: Gemini Error in response: {error_details}")
                                 try:
-                                    await websocket.send(f"[ERROR_FROM_GEMINI]: {str(error_details)}")
+                                    await ws_send(f"[ERROR_FROM_GEMINI]: {str(error_details)}")
                                 except Exception as send_exc:
-                                    print(
-                                        f"Quart Backend: Error sending Gemini error to client WebSocket: {type(send_exc).__name__}: {send_exc}")
+                                    _note_send_failure(
+                                        "Gemini error notification", send_exc)
                                 active_processing = False
                                 break
 
@@ -721,55 +1064,34 @@ async def websocket_endpoint():
                         if not active_processing:
                             break
 
-                        if not had_gemini_activity_in_this_iteration and active_processing:
-                            await asyncio.sleep(0.1)
-                        elif had_gemini_activity_in_this_iteration and active_processing:
-                            pass
-
                 except Exception as e_rcv:
-                    print(
+                    _log_exc(
                         f"Quart Backend: Error in Gemini receive processing task: {type(e_rcv).__name__}: {e_rcv}")
-                    traceback.print_exc()
                     active_processing = False
                 finally:
                     # print("Quart Backend: Stopped receiving from Gemini.")
                     active_processing = False  # Ensure graceful shutdown of the other task
-
-            forward_task = asyncio.create_task(
-                handle_client_input_and_forward(), name="ClientInputForwarder")
-            receive_task = asyncio.create_task(
-                receive_from_gemini_and_forward_to_client(), name="GeminiReceiver")
-
+                    shutdown_event.set()
+                    for key in list(transcript_flush_tasks):
+                        _drop_pending_transcript(key)
+
+            # TaskGroup gives structured cancellation for free: if either
+            # task raises, the peer is cancelled and awaited before the
+            # block exits, and cancellation of this handler propagates
+            # into both — no manual cancel/await dance in a finally.
             try:
-                await asyncio.gather(forward_task, receive_task)
-            except Exception as e_gather:
-                print(
-                    f"Quart Backend: Exception during asyncio.gather: {type(e_gather).__name__}: {e_gather}")
-                traceback.print_exc()  # Added traceback
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(
+                        handle_client_input_and_forward(), name="ClientInputForwarder")
+                    tg.create_task(
+                        receive_from_gemini_and_forward_to_client(), name="GeminiReceiver")
+            except* Exception as eg:
+                for task_exc in eg.exceptions:
+                    _log_exc(
+                        f"Quart Backend: Exception in Gemini interaction task: {type(task_exc).__name__}: {task_exc}", task_exc)
             finally:
                 active_processing = False
-                if not forward_task.done():
-                    forward_task.cancel()
-                if not receive_task.done():
-                    receive_task.cancel()
-                try:
-                    await forward_task
-                except asyncio.CancelledError:
-                    # print(f"Quart Backend: Task {forward_task.get_name()} was cancelled during cleanup.")
-                    pass  # Task cancellation is an expected part of shutdown
-                except Exception as e_fwd_cleanup:
-                    print(
-                        f"Quart Backend: Error during forward_task cleanup: {e_fwd_cleanup}")
-                    traceback.print_exc()
-                try:
-                    await receive_task
-                except asyncio.CancelledError:
-                    # print(f"Quart Backend: Task {receive_task.get_name()} was cancelled during cleanup.")
-                    pass  # Task cancellation is an expected part of shutdown
-                except Exception as e_rcv_cleanup:
-                    print(
-                        f"Quart Backend: Error during receive_task cleanup: {e_rcv_cleanup}")
-                    traceback.print_exc()  # Added traceback
+                shutdown_event.set()
 
             # print("Quart Backend: Gemini interaction tasks finished.")
     except asyncio.CancelledError:
@@ -778,49 +1100,43 @@ async def websocket_endpoint():
         # The 'async with session:' should handle session cleanup.
         pass  # Expected on client disconnect
     except Exception as e_ws_main:
-        print(
+        _log_exc(
             f"Quart Backend: UNHANDLED error in WebSocket connection main try-block: {type(e_ws_main).__name__}: {e_ws_main}")
-        traceback.print_exc()
     finally:
         # The WebSocket is implicitly closed when the handler returns,
-        # but a race condition can occur if the client disconnects simultaneously,
-        # leading to an attempt to close an already-closed connection.
-        # This block attempts to handle that gracefully.
-        try:
-            # The act of closing also serves as a check. If it's already
-            # closed, it will raise a RuntimeError.
-            await websocket.close(1000)
-        except RuntimeError as e:
-            # We expect a RuntimeError if the socket is already in the process
-            # of closing. We'll log this as a warning rather than crashing.
-            if "after sending 'websocket.close'" in str(e):
-                print(
-                    f"WebSocket connection already closing, ignoring expected error: {e}")
-            else:
-                # If it's a different RuntimeError, we should see it.
-                print(
-                    f"An unexpected runtime error occurred during WebSocket close: {e}")
-                traceback.print_exc()
-        except Exception as e:
-            # Catch any other exceptions during close for completeness.
-            print(
-                f"An unexpected error occurred during WebSocket cleanup: {e}")
-            traceback.print_exc()
+        # but the client may be disconnecting simultaneously. The flag
+        # makes the close attempt single-shot, and a RuntimeError here
+        # simply means the socket is already closing — expected on
+        # disconnect, no message-text inspection needed.
+        if not ws_close_initiated:
+            ws_close_initiated = True
+            try:
+                await websocket.close(1000)
+            except (RuntimeError, asyncio.CancelledError):
+                pass  # Already closed or closing concurrently
+            except Exception as e:
+                # Catch any other exceptions during close for completeness.
+                _log_exc(
+                    f"An unexpected error occurred during WebSocket cleanup: {e}")
 
 
 @app.route("/api/logs", methods=["GET"])
 async def get_logs():
     """API endpoint to fetch captured logs."""
-    # Combine logs from BQ's global store and our captured stdout logs
-    # Return copies to avoid issues if the lists are modified during serialization
-    combined_logs = list(GLOBAL_LOG_STORE) + list(CAPTURED_STDOUT_LOGS)
-
-    # Optional: Sort by timestamp if all logs have a compatible timestamp field
-    # For now, just concatenating. Assuming GLOBAL_LOG_STORE entries also have a timestamp
-    # or can be ordered meaningfully with the new TOOL_EVENT logs.
-    # If sorting is needed:
-    # combined_logs.sort(key=lambda x: x.get("timestamp", ""), reverse=True) # Example sort
+    # Snapshot both stores up front so concurrent appends during
+    # serialization can't skew the result, then build a single combined
+    # list in place instead of concatenating intermediate copies.
+    combined_logs = list(GLOBAL_LOG_STORE.snapshot())
+    combined_logs.extend(
+        _materialize_stdout_log(ts, line)
+        for ts, line in CAPTURED_STDOUT_LOGS.snapshot()
+    )
 
+    if orjson is not None:
+        # One C-level serialization pass; default=str covers datetime
+        # and other non-JSON-native values BQ rows may carry.
+        return Response(orjson.dumps(combined_logs, default=str),
+                        mimetype='application/json')
     return jsonify(combined_logs)
 
 